@@ -18,6 +18,7 @@ Top-level exports are provided for convenience so you can do:
         MsgTaskStarted,  # or alias: MsgTaskStart
         MsgTaskProgress,
         MsgTaskFinished,
+        MsgWrite,
         SENTINEL,
         make_overall_progress,
         make_task_progress,
@@ -42,6 +43,7 @@ from .messages import (
     MsgTaskFinished,
     MsgTaskProgress,
     MsgTaskStarted,
+    MsgWrite,
 )
 from .progress import (
     make_overall_progress,
@@ -65,6 +67,7 @@ __all__ = [  # noqa
     "MsgTaskProgress",
     "MsgTaskFinished",
     "MsgTaskFinish",  # alias
+    "MsgWrite",
     "Msg",
     "SENTINEL",
     # Progress helpers
@@ -23,7 +23,8 @@ def connect(db_path: Path, *, wal: bool = True) -> sqlite3.Connection:
     Create and configure a **thread-bound** SQLite connection.
 
     Must be called from the writer thread. The connection is not safe to pass
-    to worker threads.
+    to worker threads. It runs in autocommit mode: each statement commits on its
+    own unless wrapped in an explicit `BEGIN ... COMMIT`.
 
     Args:
         db_path (Path): Path to SQLite database (may be :memory:).
@@ -32,7 +33,17 @@ def connect(db_path: Path, *, wal: bool = True) -> sqlite3.Connection:
     Returns:
         sqlite3.Connection
     """
-    conn = sqlite3.connect(db_path, timeout=60, check_same_thread=True)
+    # timeout=60 installs SQLite's busy handler (same as PRAGMA busy_timeout=60000).
+    # isolation_level=None: no implicit BEGINs from the DB-API layer; callers that
+    # want a transaction issue BEGIN/COMMIT themselves. detect_types=0: no
+    # converter dispatch on reads.
+    conn = sqlite3.connect(
+        db_path,
+        timeout=60,
+        detect_types=0,
+        isolation_level=None,
+        check_same_thread=True,
+    )
 
     # Journal mode:
     if db_path == Path(":memory:"):
@@ -44,7 +55,8 @@ def connect(db_path: Path, *, wal: bool = True) -> sqlite3.Connection:
     conn.execute("PRAGMA synchronous=NORMAL")
     conn.execute("PRAGMA foreign_keys=ON")
     conn.execute("PRAGMA temp_store=MEMORY")
-    conn.execute("PRAGMA cache_size=-100000")  # ~100MB page cache (negative means KB)
+    conn.execute("PRAGMA cache_size=-200000")  # ~200MB page cache (negative means KB)
+    conn.execute("PRAGMA mmap_size=268435456")  # 256MB memory-mapped reads
     conn.execute("PRAGMA wal_autocheckpoint=1000")  # periodic auto-checkpoints
 
     return conn
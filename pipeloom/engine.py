@@ -41,6 +41,7 @@ def run_pipeline(
     workers: int | None = None,
     wal: bool = True,
     store_task_status: bool = True,
+    status_flush_interval: float | None = None,
     worker_fn: Callable[[TTask, queue.Queue[Msg]], None],
 ) -> None:
     """
@@ -59,6 +60,9 @@ def run_pipeline(
         Enable SQLite WAL mode for better concurrency.
     store_task_status : bool
         Maintain `task_runs` table.
+    status_flush_interval : float | None
+        Batch `task_runs` updates and commit them at most every N seconds instead of
+        once per message. `None` (default) commits each update immediately.
     worker_fn : Callable[[TTask, queue.Queue[Msg]], None]
         Invoked per task. Communicate via `msg_q`.
 
@@ -107,6 +111,7 @@ def run_pipeline(
                     msg_q=msg_q,
                     wal=wal,
                     store_task_status=store_task_status,
+                    status_flush_interval=status_flush_interval,
                     task_progress=task_p,
                     task_bar_map=bar_map,
                 )
@@ -6,7 +6,8 @@ csv_loader.py
 Batch load CSV files into a SQLite database with pipeloom:
 
 - Each task corresponds to one CSV file in a folder.
-- Worker reads the CSV with Python's csv.DictReader, then UPSERTs into SQLite.
+- Worker reads the CSV with Python's csv.reader, then hands the rows to the
+  single writer thread (`MsgWrite`), which UPSERTs them into SQLite.
 - Demonstrates idempotent loads with ON CONFLICT, batching, and schema creation.
 
 This example shows how pipeloom can manage classic "folder full of CSVs" ETL
@@ -17,14 +18,14 @@ from __future__ import annotations
 
 import csv
 import queue
-from collections.abc import Iterable
+import sqlite3
+import time
 from dataclasses import dataclass
-from datetime import UTC, datetime
+from functools import partial
 from pathlib import Path
 
-from pipeloom.db import connect, wal_checkpoint
 from pipeloom.engine import run_pipeline
-from pipeloom.messages import MsgTaskFinished, MsgTaskProgress, MsgTaskStarted
+from pipeloom.messages import MsgTaskFinished, MsgTaskProgress, MsgTaskStarted, MsgWrite
 from pipeloom.rlog import setup_logging
 
 
@@ -47,71 +48,51 @@ CREATE TABLE IF NOT EXISTS items(
 """
 
 
-def upsert_rows(db_path: Path, table: str, key: str, rows: Iterable[dict]) -> int:
-    con = connect(db_path=db_path, wal=True)
-    try:
-        con.execute("PRAGMA journal_mode=WAL;")
-        con.execute("PRAGMA synchronous=NORMAL;")
-        con.execute(DDL)
-        con.commit()
-
-        sample = next(iter(rows), None)
-        if sample is None:
-            return 0
-        cols = list(sample.keys())
-        col_list = ", ".join(cols)
-        placeholders = ", ".join(["?"] * len(cols))
-        update_list = ", ".join([f"{c}=excluded.{c}" for c in cols if c != key])
-        sql = f"INSERT INTO {table}({col_list}) VALUES({placeholders}) ON CONFLICT({key}) DO UPDATE SET {update_list}"
-
-        # reinsert sample then the rest in batches
-        batch = [tuple(sample[c] for c in cols)]
-        count = 1
-        b = 5000
-
-        def flush():
-            nonlocal batch, count
-            if batch:
-                con.execute("BEGIN IMMEDIATE;")
-                try:
-                    con.executemany(sql, batch)
-                    con.commit()
-                except Exception:
-                    con.rollback()
-                    raise
-                count += len(batch)
-                batch = []
-
-        for row in rows:
-            batch.append(tuple(row.get(c) for c in cols))
-            if len(batch) >= b:
-                flush()
-        flush()
-        return count - 1  # minus the initial sample counted twice
-    finally:
-        wal_checkpoint(con, "TRUNCATE")
-        con.close()
-
-
-def make_worker(db_path: Path):
+def upsert_rows(
+    con: sqlite3.Connection,
+    *,
+    table: str,
+    key: str,
+    cols: list[str],
+    rows: list[list[str | None]],
+) -> None:
+    """Runs on the pipeline's writer thread (see `MsgWrite`), inside its transaction."""
+    con.execute(DDL)
+    if not rows:
+        return
+    col_list = ", ".join(cols)
+    placeholders = ", ".join(["?"] * len(cols))
+    update_list = ", ".join([f"{c}=excluded.{c}" for c in cols if c != key])
+    sql = f"INSERT INTO {table}({col_list}) VALUES({placeholders}) ON CONFLICT({key}) DO UPDATE SET {update_list}"
+    # Rows are bound exactly as the C csv parser produced them: no per-row dict/tuple.
+    con.executemany(sql, rows)
+
+
+def make_worker():
     def worker(task: CsvTask, msg_q: queue.Queue) -> None:
-        started = datetime.now(UTC).isoformat()
+        started = time.time_ns()
         msg_q.put(MsgTaskStarted(task.task_id, task.name, started))
         try:
             total = 2
             msg_q.put(MsgTaskProgress(task.task_id, 1, total, "reading"))
             with task.csv_path.open("r", newline="") as f:
-                reader = csv.DictReader(f)
-                # Clone iterable because upsert_rows peeks one row
-                rows = list(reader)
+                reader = csv.reader(f)
+                cols = next(reader, [])
+                n = len(cols)
+                # Skip blank lines and fit ragged rows to the header like DictReader:
+                # missing fields become NULL, extra fields are dropped.
+                rows = [r if len(r) == n else r[:n] + [None] * (n - len(r)) for r in reader if r]
             msg_q.put(MsgTaskProgress(task.task_id, 2, total, f"upserting:{len(rows)}"))
-            n = upsert_rows(db_path, task.table, task.key, rows)
-            finished = datetime.now(UTC).isoformat()
+            # Only the writer touches SQLite; it runs the upsert on its own connection.
             msg_q.put(
-                MsgTaskFinished(task.task_id, "done", finished, result=f"rows:{n}"),
+                MsgWrite(task.task_id, partial(upsert_rows, table=task.table, key=task.key, cols=cols, rows=rows)),
+            )
+            finished = time.time_ns()
+            msg_q.put(
+                MsgTaskFinished(task.task_id, "done", finished, result=f"rows:{len(rows)}"),
             )
         except Exception as e:
-            finished = datetime.now(UTC).isoformat()
+            finished = time.time_ns()
             msg_q.put(MsgTaskFinished(task.task_id, "error", finished, message=str(e)))
 
     return worker
@@ -128,7 +109,7 @@ def main() -> None:
         workers=4,
         wal=True,
         store_task_status=True,
-        worker_fn=make_worker(db),
+        worker_fn=make_worker(),
     )
 
 
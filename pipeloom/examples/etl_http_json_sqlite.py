@@ -5,9 +5,14 @@ etl_http_json_sqlite.py
 
 Minimal ETL pipeline using pipeloom:
 
-- Extract: fetch JSON from an HTTP API (JSONPlaceholder).
-- Transform: select and normalize columns into a Polars DataFrame.
-- Load: create/ensure SQLite tables, then UPSERT rows in batches.
+- Extract: fetch JSON from an HTTP API (JSONPlaceholder). Validators from the
+  last successful load are sent as a conditional GET; a 304 finishes the task
+  without transforming or loading anything.
+- Transform: select and normalize columns as a lazy Polars plan.
+- Load: bulk-copy rows into a scratch staging file (ADBC/Arrow), then hand
+  it to the single writer thread (`MsgWrite`), which ATTACHes it and UPSERTs
+  the staged rows with a single set-based statement; loads from several tasks
+  share one transaction.
 
 This demonstrates how to orchestrate a realistic ETL workflow with pipeloom,
 including progress reporting, schema enforcement, and retry handling.
@@ -15,18 +20,24 @@ including progress reporting, schema enforcement, and retry handling.
 
 from __future__ import annotations
 
+import io
+import os
+import sqlite3
+import tempfile
 import time
-from collections.abc import Iterable
-from dataclasses import dataclass
-from datetime import UTC, datetime
+from contextlib import closing, suppress
+from dataclasses import dataclass, field, replace
+from functools import cache, partial
 from pathlib import Path
 
+import adbc_driver_sqlite.dbapi as adbc_sqlite
 import polars as pl
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-from pipeloom.db import connect, wal_checkpoint
 from pipeloom.engine import run_pipeline
-from pipeloom.messages import MsgTaskFinished, MsgTaskProgress, MsgTaskStarted
+from pipeloom.messages import MsgTaskFinished, MsgTaskProgress, MsgTaskStarted, MsgWrite
 from pipeloom.rlog import logger, setup_logging
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -41,99 +52,229 @@ class Task:
     url: str
     table: str
     schema_sql: str  # explicit CREATE TABLE IF NOT EXISTS ...
-    select_cols: Iterable[str]
+    select_cols: tuple[str, ...]
     key: str = "id"  # upsert key
+    schema: dict[str, pl.DataType] = field(default_factory=dict)  # Polars dtypes matching schema_sql
+    etag: str | None = None  # validators from the last load, see `with_cached_validators`
+    last_modified: str | None = None
+    _select_set: frozenset[str] = field(init=False, repr=False, compare=False)
+    _frame_schema: dict[str, pl.DataType | None] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        # Materialize once: a generator would be exhausted after the first transform.
+        object.__setattr__(self, "select_cols", tuple(self.select_cols))
+        object.__setattr__(self, "_select_set", frozenset(self.select_cols))
+        # Declared dtypes per selected column; any None falls back to inference.
+        object.__setattr__(self, "_frame_schema", {c: self.schema.get(c) for c in self.select_cols})
 
 
 # ──────────────────────────────────────────────────────────────────────────────
 # ETL helpers
 # ──────────────────────────────────────────────────────────────────────────────
 
+# One shared session so workers reuse pooled keep-alive connections (no TCP/TLS
+# handshake per task). Retries with exponential backoff live on the adapter.
+HTTP_POOL_SIZE = 16
+SESSION = requests.Session()
+SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=HTTP_POOL_SIZE,
+        pool_maxsize=HTTP_POOL_SIZE,
+        max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504)),
+    ),
+)
+
+
+# Last ETag/Last-Modified per (URL, target table); written with the data it describes.
+HTTP_CACHE_DDL = """
+  CREATE TABLE IF NOT EXISTS http_cache(
+    url           TEXT NOT NULL,
+    target        TEXT NOT NULL,
+    etag          TEXT,
+    last_modified TEXT,
+    PRIMARY KEY (url, target)
+  );
+"""
 
-def http_get_json(url: str, *, retries: int = 3, timeout: float = 15.0) -> list[dict]:
-    last_exc: Exception | None = None
-    for attempt in range(1, retries + 1):
-        try:
-            logger.info("GET %s (attempt %d/%d)", url, attempt, retries)
-            r = requests.get(url, timeout=timeout)
-            r.raise_for_status()
-            data = r.json()
-            return data if isinstance(data, list) else [data]
-        except (requests.RequestException, ValueError) as e:
-            last_exc = e
-            # simple backoff: 0.5, 1.0, 2.0
-            time.sleep(0.5 * (2 ** (attempt - 1)))
-    assert last_exc is not None
-    raise last_exc
-
-
-def transform_to_df(data: list[dict], select_cols: Iterable[str]) -> pl.DataFrame:
-    if not data:
-        # build empty DF with desired columns (all Null)
-        return pl.DataFrame(schema=dict.fromkeys(select_cols, pl.Null))
-    df = pl.DataFrame(data)
-    # keep only the requested columns (create missing as Null)
-    keep = []
-    for c in select_cols:
-        if c in df.columns:
-            keep.append(c)
-        else:
-            df = df.with_columns(pl.lit(None).alias(c))
-            keep.append(c)
-    out = df.select(keep)
+
+def with_cached_validators(db_path: Path, tasks: list[Task]) -> list[Task]:
+    """
+    Attach stored validators to each task; runs once, before the pipeline starts.
+
+    Reading them up front keeps workers off SQLite entirely. Validators are only
+    used while their target table exists, so a new or dropped table gets a full GET.
+    """
+    try:
+        uri = f"{db_path.resolve().as_uri()}?mode=ro"
+        with closing(sqlite3.connect(uri, uri=True)) as con:
+            rows = con.execute(
+                """
+                SELECT c.url, c.target, c.etag, c.last_modified
+                FROM http_cache AS c
+                JOIN sqlite_master AS m ON m.type = 'table' AND m.name = c.target;
+                """,
+            ).fetchall()
+    except sqlite3.OperationalError:  # no database or cache table yet: first run
+        return tasks
+    cached = {(url, target): (etag, last_modified) for url, target, etag, last_modified in rows}
+    out = []
+    for t in tasks:
+        if (t.url, t.table) in cached:
+            etag, last_modified = cached[(t.url, t.table)]
+            t = replace(t, etag=etag, last_modified=last_modified)
+        out.append(t)
+    return out
+
+
+def http_get(
+    url: str,
+    *,
+    etag: str | None = None,
+    last_modified: str | None = None,
+    timeout: float = 15.0,
+) -> requests.Response:
+    """GET `url`, conditional on the given validators; a 304 means the data is unchanged."""
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    logger.info("GET %s", url)
+    r = SESSION.get(url, headers=headers, timeout=timeout)
+    r.raise_for_status()
+    return r
+
+
+def _is_empty_json(body: bytes) -> bool:
+    """True for a blank body or an empty top-level array (Polars cannot infer those)."""
+    return len(body) < 64 and b"".join(body.split()) in (b"", b"[]")
+
+
+def _coerce(name: str, dtype: pl.DataType | None, have: dict[str, pl.DataType]) -> pl.Expr:
+    """Lenient per-column coercion: missing columns and unparseable values become Null."""
+    if name not in have:
+        return pl.lit(None, dtype=dtype or pl.Null).alias(name)
+    if dtype is None or have[name] == dtype:
+        return pl.col(name)
+    if have[name] == pl.String and dtype == pl.Boolean:  # no String → Boolean cast in Polars
+        return pl.col(name).replace_strict({"true": True, "false": False}, default=None, return_dtype=pl.Boolean)
+    return pl.col(name).cast(dtype, strict=False)
+
+
+def extract_transform(task: Task, body: bytes) -> pl.LazyFrame:
+    # Parse the raw body in Rust straight to typed Arrow columns: no Python
+    # list[dict] is ever built. With a full schema only the selected columns
+    # are materialized (unknown keys are skipped, missing ones become Null);
+    # a top-level object reads as a single row. The rest of the plan stays
+    # lazy; the worker collects it once.
+    if _is_empty_json(body):
+        return pl.LazyFrame(schema={c: t or pl.Null for c, t in task._frame_schema.items()})
+    df = None
+    if None not in task._frame_schema.values():
+        with suppress(pl.exceptions.ComputeError):  # a value that doesn't parse as its dtype
+            df = pl.read_json(io.BytesIO(body), schema=task._frame_schema)
+    if df is None:
+        # Partial schema or mixed-type values: infer over every record, then coerce.
+        df = pl.read_json(io.BytesIO(body), infer_schema_length=None)
+        have = dict(df.schema)
+        df = df.select([_coerce(c, t, have) for c, t in task._frame_schema.items()])
+    lf = df.lazy()
     # normalize some common types (optional but nice for demos)
-    if "completed" in out.columns:
-        out = out.with_columns(
+    if "completed" in task._select_set:
+        lf = lf.with_columns(
             pl.col("completed")
             .cast(pl.Boolean, strict=False)
             .fill_null(False)
             .cast(pl.Int8),  # store as 0/1 per your schema
         )
-    for c in ("id", "userId"):
-        if c in out.columns:
-            out = out.with_columns(pl.col(c).cast(pl.Int64, strict=False))
-    return out
-
-
-def ensure_schema(db_path: Path, ddl: str) -> None:
-    con = connect(db_path=db_path, wal=True)
-    try:
-        con.execute(ddl)
-        con.commit()
-    finally:
-        con.close()
+    return lf
+
+
+@cache
+def upsert_sql(table: str, key: str, cols: tuple[str, ...], schema: str) -> str:
+    """Build (once per table/column set) the staging → target UPSERT statement."""
+    col_list = ", ".join(cols)
+    update_list = ", ".join([f"{c}=excluded.{c}" for c in cols if c != key])
+    # `main.` keeps the target from resolving to the attached stage's same-named table;
+    # `WHERE true` disambiguates ON CONFLICT from a join constraint in INSERT ... SELECT
+    return f"""
+        INSERT INTO main.{table}({col_list})
+        SELECT {col_list} FROM {schema}.{table} WHERE true
+        ON CONFLICT({key}) DO UPDATE SET
+          {update_list}
+    """
+
+
+def stage_df(table: str, df: pl.DataFrame) -> Path | None:
+    """
+    Bulk-copy a frame into a private scratch SQLite file (runs on the worker).
+
+    The frame goes to ADBC's `adbc_ingest` as an Arrow stream (zero-copy), which
+    binds columns into SQLite in native code with no per-row Python objects. ADBC
+    links its own copy of SQLite, so it must never open the pipeline DB: two SQLite
+    libraries on one file in one process break each other's locks.
+    """
+    if df.is_empty():
+        return None
+    fd, name = tempfile.mkstemp(prefix=f"pipeloom_stg_{table}_", suffix=".db")
+    os.close(fd)
+    stage = Path(name)
+    with adbc_sqlite.connect(str(stage), autocommit=True) as conn, conn.cursor() as cur:
+        # Throwaway file: skip the rollback journal and fsyncs entirely.
+        cur.execute("PRAGMA journal_mode=OFF;")
+        cur.fetchall()
+        cur.execute("PRAGMA synchronous=OFF;")
+        cur.adbc_ingest(table, df, mode="create")
+    return stage
+
+
+def load_staged(
+    con: sqlite3.Connection,
+    *,
+    task: Task,
+    cols: tuple[str, ...],
+    stage: Path | None,
+    etag: str | None = None,
+    last_modified: str | None = None,
+) -> None:
+    """
+    Merge a staged frame into `task.table` with one set-based UPSERT.
+
+    Runs on the pipeline's writer thread inside its batch transaction (see
+    `MsgWrite`); each task attaches its stage under its own schema name so
+    several tasks can share one commit. The response validators are saved in
+    the same write, so they are only kept if the data they describe is.
+
+    The `IF NOT EXISTS` DDL runs on every write rather than being remembered:
+    it is a cheap schema lookup, and it stays correct when a batch rollback
+    undoes a CREATE TABLE or a table is dropped between runs.
+    """
+    con.execute(task.schema_sql)
+    if stage is not None:
+        schema = f"stg_{task.task_id}"
+        con.execute(f"ATTACH DATABASE ? AS {schema};", (str(stage),))
+        con.execute(upsert_sql(task.table, task.key, cols, schema))
+    if etag or last_modified:
+        con.execute(HTTP_CACHE_DDL)
+        con.execute(
+            """
+            INSERT INTO http_cache(url, target, etag, last_modified) VALUES (?, ?, ?, ?)
+            ON CONFLICT(url, target) DO UPDATE SET
+              etag=excluded.etag,
+              last_modified=excluded.last_modified;
+            """,
+            (task.url, task.table, etag, last_modified),
+        )
 
 
-def upsert_df(db_path: Path, table: str, key: str, df: pl.DataFrame) -> None:
-    if df.is_empty():
+def drop_stage(con: sqlite3.Connection, *, task: Task, stage: Path | None) -> None:
+    """Detach and delete the scratch file once the batch transaction has ended."""
+    if stage is None:
         return
-    con = connect(db_path=db_path, wal=True)
-    try:
-        con.execute("PRAGMA journal_mode=WAL;")
-        con.execute("PRAGMA synchronous=NORMAL;")
-        cols = df.columns
-        col_list = ", ".join(cols)
-        placeholders = ", ".join(["?"] * len(cols))
-        update_list = ", ".join([f"{c}=excluded.{c}" for c in cols if c != key])
-        sql = f"""
-            INSERT INTO {table}({col_list})
-            VALUES ({placeholders})
-            ON CONFLICT({key}) DO UPDATE SET
-              {update_list}
-        """
-        chunk = 100_000
-        for offset in range(0, df.height, chunk):
-            view = df.slice(offset, min(chunk, df.height - offset))
-            con.execute("BEGIN IMMEDIATE;")
-            try:
-                con.executemany(sql, view.iter_rows())
-                con.commit()
-            except Exception:
-                con.rollback()
-                raise
-    finally:
-        wal_checkpoint(con, "TRUNCATE")
-        con.close()
+    with suppress(sqlite3.OperationalError):  # not attached if `load_staged` failed early
+        con.execute(f"DETACH DATABASE stg_{task.task_id};")
+    stage.unlink(missing_ok=True)
 
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -141,23 +282,42 @@ def upsert_df(db_path: Path, table: str, key: str, df: pl.DataFrame) -> None:
 # ──────────────────────────────────────────────────────────────────────────────
 
 
-def make_worker(db_path: Path):
+def make_worker():
     def worker(task: Task, msg_q) -> None:
-        started = datetime.now(UTC).isoformat()
+        started = time.time_ns()
         msg_q.put(MsgTaskStarted(task.task_id, task.name, started))
         try:
             total = 3
-            raw = http_get_json(task.url)
+            r = http_get(task.url, etag=task.etag, last_modified=task.last_modified)
+            if r.status_code == 304:
+                # Unchanged since the last load: skip transform and load entirely.
+                msg_q.put(MsgTaskProgress(task.task_id, total, total, "not modified"))
+                msg_q.put(MsgTaskFinished(task.task_id, "done", time.time_ns(), result=f"not-modified:{task.name}"))
+                return
             msg_q.put(MsgTaskProgress(task.task_id, 1, total, "extracted"))
 
-            df = transform_to_df(raw, select_cols=task.select_cols)
+            df = extract_transform(task, r.content).collect(engine="streaming")
+            stage = stage_df(task.table, df)
             msg_q.put(MsgTaskProgress(task.task_id, 2, total, "transformed"))
 
-            ensure_schema(db_path, task.schema_sql)
-            upsert_df(db_path, task.table, task.key, df)
-            msg_q.put(MsgTaskProgress(task.task_id, 3, total, "loaded"))
+            # Only the writer touches the pipeline DB; it merges the staged rows.
+            msg_q.put(
+                MsgWrite(
+                    task.task_id,
+                    partial(
+                        load_staged,
+                        task=task,
+                        cols=tuple(df.columns),
+                        stage=stage,
+                        etag=r.headers.get("ETag"),
+                        last_modified=r.headers.get("Last-Modified"),
+                    ),
+                    on_done=partial(drop_stage, task=task, stage=stage),
+                ),
+            )
+            msg_q.put(MsgTaskProgress(task.task_id, 3, total, "queued"))
 
-            finished = datetime.now(UTC).isoformat()
+            finished = time.time_ns()
             msg_q.put(
                 MsgTaskFinished(
                     task.task_id,
@@ -167,7 +327,7 @@ def make_worker(db_path: Path):
                 ),
             )
         except Exception as e:
-            finished = datetime.now(UTC).isoformat()
+            finished = time.time_ns()
             msg_q.put(MsgTaskFinished(task.task_id, "error", finished, message=str(e)))
 
     return worker
@@ -192,6 +352,7 @@ def main() -> None:
         """,
         select_cols=("id", "userId", "title", "body"),
         key="id",
+        schema={"id": pl.Int64, "userId": pl.Int64, "title": pl.String, "body": pl.String},
     )
 
     todos = Task(
@@ -209,15 +370,17 @@ def main() -> None:
         """,
         select_cols=("id", "userId", "title", "completed"),
         key="id",
+        schema={"id": pl.Int64, "userId": pl.Int64, "title": pl.String, "completed": pl.Boolean},
     )
 
     run_pipeline(
         db_path=db,
-        tasks=[posts, todos],
+        tasks=with_cached_validators(db, [posts, todos]),
         workers=4,
         wal=True,
         store_task_status=True,
-        worker_fn=make_worker(db),
+        status_flush_interval=1.0,
+        worker_fn=make_worker(),
     )
 
 
@@ -19,9 +19,9 @@ import logging
 import os
 import queue
 import tempfile
+import time
 from collections.abc import Callable
 from dataclasses import dataclass
-from datetime import UTC, datetime
 from pathlib import Path
 from typing import Protocol
 
@@ -76,7 +76,7 @@ def write_bytes(*, bytes_to_write: int, chunk_size: int = 1 << 20) -> Path:
 
 def make_worker() -> Callable[[Task, queue.Queue], None]:
     def worker(task: Task, msg_q) -> None:
-        started_at = datetime.now(UTC).isoformat()
+        started_at = time.time_ns()
         msg_q.put(MsgTaskStarted(task.task_id, task.name, started_at))
         steps = 3
         try:
@@ -88,7 +88,7 @@ def make_worker() -> Callable[[Task, queue.Queue], None]:
             msg_q.put(MsgTaskProgress(task.task_id, 2, steps, "write"))
             size = out_path.stat().st_size
             msg_q.put(MsgTaskProgress(task.task_id, 3, steps, f"verify:{size}B"))
-            finished_at = datetime.now(UTC).isoformat()
+            finished_at = time.time_ns()
             msg_q.put(
                 MsgTaskFinished(
                     task.task_id,
@@ -99,7 +99,7 @@ def make_worker() -> Callable[[Task, queue.Queue], None]:
                 ),
             )
         except Exception as e:
-            finished_at = datetime.now(UTC).isoformat()
+            finished_at = time.time_ns()
             msg_q.put(
                 MsgTaskFinished(task.task_id, "error", finished_at, message=str(e)),
             )
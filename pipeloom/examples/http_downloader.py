@@ -6,7 +6,8 @@ http_downloader.py
 Download remote files and record a manifest table with pipeloom:
 
 - Each task downloads a URL to a local path.
-- Worker computes SHA256 and size, then records metadata in SQLite.
+- Worker computes SHA256 and size, then has the writer thread record metadata
+  in the pipeline's SQLite DB (`MsgWrite`).
 - Demonstrates reproducible file pipelines and idempotent manifest tracking.
 
 This pattern is common for data lakes or archival tasks, where provenance and
@@ -17,14 +18,16 @@ from __future__ import annotations
 
 import hashlib
 import queue
+import sqlite3
+import time
 import urllib.request
 from dataclasses import dataclass
 from datetime import UTC, datetime
+from functools import partial
 from pathlib import Path
 
-from pipeloom.db import connect
 from pipeloom.engine import run_pipeline
-from pipeloom.messages import MsgTaskFinished, MsgTaskProgress, MsgTaskStarted
+from pipeloom.messages import MsgTaskFinished, MsgTaskProgress, MsgTaskStarted, MsgWrite
 from pipeloom.rlog import setup_logging
 
 
@@ -71,25 +74,21 @@ def sha256(path: Path) -> tuple[str, int]:
     return h.hexdigest(), total
 
 
-def record(db: Path, url: str, dest: Path, digest: str, size: int) -> None:
-    con = connect(db_path=db, wal=True)
-    try:
-        con.execute(DDL)
-        con.execute(
-            "INSERT INTO manifest(url, path, sha256, size, fetched_at) "
-            "VALUES (?, ?, ?, ?, ?) "
-            "ON CONFLICT(url) DO UPDATE SET path=excluded.path, sha256=excluded.sha256, size=excluded.size, fetched_at=excluded.fetched_at",  # noqa: E501
-            (url, str(dest), digest, size, datetime.now(UTC).isoformat()),
-        )
-        con.commit()
-    finally:
-        con.close()
+def record(con: sqlite3.Connection, *, url: str, dest: Path, digest: str, size: int, fetched_at: str) -> None:
+    """Runs on the pipeline's writer thread (see `MsgWrite`), inside its transaction."""
+    con.execute(DDL)
+    con.execute(
+        "INSERT INTO manifest(url, path, sha256, size, fetched_at) "
+        "VALUES (?, ?, ?, ?, ?) "
+        "ON CONFLICT(url) DO UPDATE SET path=excluded.path, sha256=excluded.sha256, size=excluded.size, fetched_at=excluded.fetched_at",  # noqa: E501
+        (url, str(dest), digest, size, fetched_at),
+    )
 
 
-def make_worker(db: Path):
+def make_worker():
     def worker(task: DownloadTask, msg_q: queue.Queue) -> None:
         msg_q.put(
-            MsgTaskStarted(task.task_id, task.name, datetime.now(UTC).isoformat()),
+            MsgTaskStarted(task.task_id, task.name, time.time_ns()),
         )
         try:
             total = 3
@@ -98,12 +97,18 @@ def make_worker(db: Path):
             msg_q.put(MsgTaskProgress(task.task_id, 2, total, "hash"))
             digest, size = sha256(out)
             msg_q.put(MsgTaskProgress(task.task_id, 3, total, "record"))
-            record(Path("downloads.db"), task.url, out, digest, size)
+            fetched_at = datetime.now(UTC).isoformat()
+            msg_q.put(
+                MsgWrite(
+                    task.task_id,
+                    partial(record, url=task.url, dest=out, digest=digest, size=size, fetched_at=fetched_at),
+                ),
+            )
             msg_q.put(
                 MsgTaskFinished(
                     task.task_id,
                     "done",
-                    datetime.now(UTC).isoformat(),
+                    time.time_ns(),
                     result=f"{out.name}:{size}B",
                 ),
             )
@@ -112,7 +117,7 @@ def make_worker(db: Path):
                 MsgTaskFinished(
                     task.task_id,
                     "error",
-                    datetime.now(UTC).isoformat(),
+                    time.time_ns(),
                     message=str(e),
                 ),
             )
@@ -144,7 +149,7 @@ def main() -> None:
         workers=3,
         wal=True,
         store_task_status=True,
-        worker_fn=make_worker(db),
+        worker_fn=make_worker(),
     )
 
 
@@ -11,16 +11,39 @@ Workers should **never** touch SQLite directly (SQLite connections are not
 thread-safe across threads). Instead, workers publish *intent* via small,
 immutable dataclasses. The writer is the only component that owns a SQLite
 connection and it executes the requested changes in a single, serialized place.
+Domain data (e.g., ETL outputs) travels the same way via `MsgWrite`.
 """
 
 from __future__ import annotations
 
+import sqlite3
+from collections.abc import Callable
 from dataclasses import dataclass
+from datetime import UTC, datetime
 
 # Special object placed on the queue to request the writer to shut down cleanly.
 SENTINEL: object = object()
 
 
+def to_iso(ts: str | int) -> str:
+    """
+    Normalize a message timestamp to an ISO 8601 UTC string.
+
+    Workers may pass `time.time_ns()` (a plain int, no `datetime` allocated on the
+    hot path); formatting is deferred until the writer actually persists it.
+
+    Args:
+        ts (str | int): ISO 8601 UTC string, or integer nanoseconds since the epoch.
+
+    Returns:
+        str: ISO 8601 UTC string.
+    """
+    if isinstance(ts, str):
+        return ts
+    secs, ns = divmod(ts, 1_000_000_000)
+    return datetime.fromtimestamp(secs, UTC).replace(microsecond=ns // 1000).isoformat()
+
+
 @dataclass(frozen=True)
 class MsgTaskStarted:
     """
@@ -30,12 +53,13 @@ class MsgTaskStarted:
     Attributes:
         task_id (int): Unique identifier for the task.
         name (str): Display-friendly name shown in logs and progress UI.
-        started_at (str): ISO 8601 UTC string (avoid tz-naive datetimes over queues).
+        started_at (str | int): ISO 8601 UTC string (avoid tz-naive datetimes over queues),
+            or `time.time_ns()`; the writer formats it only when persisting.
     """
 
     task_id: int
     name: str
-    started_at: str  # ISO 8601 UTC string (avoid tz-naive datetimes over queues)
+    started_at: str | int  # ISO 8601 UTC string or epoch nanoseconds
 
 
 @dataclass(frozen=True)
@@ -64,16 +88,39 @@ class MsgTaskFinished:
     Attributes:
         task_id (int): Unique identifier for the task.
         status (str): Final status of the task ("done" | "error" | "cancelled").
-        finished_at (str): ISO 8601 UTC string (avoid tz-naive datetimes over queues).
+        finished_at (str | int): ISO 8601 UTC string (avoid tz-naive datetimes over queues),
+            or `time.time_ns()`; the writer formats it only when persisting.
         result (str | None): Optional result payload for the completed task.
         message (str): Optional status message for the completed task.
     """
 
     task_id: int
     status: str  # "done" | "error" | "cancelled"
-    finished_at: str  # ISO 8601 UTC string
+    finished_at: str | int  # ISO 8601 UTC string or epoch nanoseconds
     result: str | None = None
     message: str = ""
 
 
-Msg = MsgTaskStarted | MsgTaskProgress | MsgTaskFinished
+@dataclass(frozen=True)
+class MsgWrite:
+    """
+    Domain write executed by the writer thread on its own connection.
+    Workers prepare the payload (rows, frames, ...) and wrap the SQL in `apply`;
+    the writer runs it serialized with all other writes. Writes that arrive
+    together are committed in a single transaction, so `apply` must not
+    commit or roll back itself.
+
+    Attributes:
+        task_id (int): Unique identifier for the task that produced the write.
+        apply (Callable[[sqlite3.Connection], None]): Performs the write using the writer's connection.
+            If it raises, the write is rolled back and the task is recorded as "error".
+        on_done (Callable[[sqlite3.Connection], None] | None): Optional cleanup run after the
+            transaction ends (commit or rollback), e.g. to DETACH a database attached by `apply`.
+    """
+
+    task_id: int
+    apply: Callable[[sqlite3.Connection], None]
+    on_done: Callable[[sqlite3.Connection], None] | None = None
+
+
+Msg = MsgTaskStarted | MsgTaskProgress | MsgTaskFinished | MsgWrite
@@ -6,7 +6,9 @@ The **single** SQLite writer thread. It:
 
 - Opens and owns the only SQLite connection (configured for WAL).
 - Consumes message objects from a thread-safe Queue.
-- Writes task status/progress to SQLite (optional).
+- Writes task status/progress to SQLite (optional, optionally batched by time).
+- Executes domain writes (`MsgWrite`) published by workers, group-committing
+  writes that arrive together in a single transaction.
 - Updates/removes Rich per-task progress bars safely.
 
 Why a single writer?
@@ -22,16 +24,22 @@ import logging
 import queue
 import sqlite3
 import threading
+import time
+from dataclasses import replace
 from pathlib import Path
 
 from rich.progress import Progress, TaskID
 
 from . import db as dbmod
 from .engine import Msg
-from .messages import SENTINEL, MsgTaskFinished, MsgTaskProgress, MsgTaskStarted
+from .messages import SENTINEL, MsgTaskFinished, MsgTaskProgress, MsgTaskStarted, MsgWrite, to_iso
 
 LOG = logging.getLogger(__name__)
 
+# Upper bound on domain writes folded into one transaction. Kept below SQLite's
+# default limit of 10 attached databases so ATTACH-based writes fit in a batch.
+MAX_BATCH_WRITES = 8
+
 
 class SQLiteWriter(threading.Thread):
     """
@@ -44,8 +52,14 @@ class SQLiteWriter(threading.Thread):
         store_task_status (bool): Toggle persistence of task status into the `task_runs` table.
         task_progress (Progress | None): Rich Progress manager used for per-task bars (transient).
         task_bar_map (dict[int, TaskID] | None): Pre-registered mapping: task_id -> Rich TaskID (prevents render races).
+        status_flush_interval (float | None): If set, buffer `task_runs` updates in one transaction and
+            commit at most every N seconds (and when idle/at shutdown) instead of once per message.
     """
 
+    # Seconds to wait for a message before treating the queue as idle; an idle
+    # poll commits buffered status updates and re-checks the stop flag.
+    poll_interval: float = 0.5
+
     def __init__(
         self,
         db_path: Path,
@@ -55,6 +69,7 @@ class SQLiteWriter(threading.Thread):
         store_task_status: bool = True,
         task_progress: Progress | None = None,
         task_bar_map: dict[int, TaskID] | None = None,
+        status_flush_interval: float | None = None,
     ) -> None:
         super().__init__(daemon=True)
         self.db_path = db_path
@@ -64,6 +79,11 @@ class SQLiteWriter(threading.Thread):
         self._progress = task_progress
         self._progress_tasks: dict[int, TaskID] = dict(task_bar_map or {})
         self._conn: sqlite3.Connection | None = None
+        self._status_interval = status_flush_interval
+        self._last_status_commit = time.monotonic()
+        self._pending_writes: list[MsgWrite] = []
+        self._deferred_finishes: list[MsgTaskFinished] = []
+        self._failed_writes: dict[int, str] = {}
         self._stop_flag = threading.Event()
 
     # --- message handlers --------------------------------------------------------------
@@ -75,6 +95,7 @@ class SQLiteWriter(threading.Thread):
         """
         assert self._conn is not None
         if self._store:
+            self._begin_status()
             self._conn.execute(
                 """
                 INSERT INTO task_runs (id,name,status,progress,started_at,message)
@@ -82,9 +103,9 @@ class SQLiteWriter(threading.Thread):
                 ON CONFLICT(id) DO UPDATE SET
                   name=excluded.name, status='running', progress=0.0, started_at=excluded.started_at, message=''
                 """,
-                (m.task_id, m.name, m.started_at),
+                (m.task_id, m.name, to_iso(m.started_at)),
             )
-            self._conn.commit()
+            self._commit_status()
 
     def _on_progress(self, m: MsgTaskProgress) -> None:
         """Update DB progress as fraction and drive the Rich bar.
@@ -96,11 +117,12 @@ class SQLiteWriter(threading.Thread):
         pct = round(100.0 * (m.step / max(1, m.total)), 2)
 
         if self._store:
+            self._begin_status()
             self._conn.execute(
                 "UPDATE task_runs SET progress=?, message=? WHERE id=?",
                 (pct / 100.0, m.message, m.task_id),
             )
-            self._conn.commit()
+            self._commit_status()
 
         # IMPORTANT: Rich TaskID can be 0; do not use `if tid:` or walrus in condition.
         if self._progress:
@@ -108,6 +130,78 @@ class SQLiteWriter(threading.Thread):
             if tid is not None:
                 self._progress.update(tid, completed=int(pct))
 
+    def _begin_status(self) -> None:
+        """Open the transaction that buffers `task_runs` updates (batched mode only)."""
+        assert self._conn is not None
+        if self._status_interval is not None and not self._conn.in_transaction:
+            self._conn.execute("BEGIN")
+
+    def _commit_status(self, *, force: bool = False) -> None:
+        """Commit buffered `task_runs` updates, honoring `status_flush_interval`.
+
+        Args:
+            force (bool): Commit regardless of the interval (idle, before domain writes, shutdown).
+        """
+        assert self._conn is not None
+        now = time.monotonic()
+        if force or self._status_interval is None or now - self._last_status_commit >= self._status_interval:
+            self._conn.commit()
+            self._last_status_commit = now
+
+    def _on_write(self, m: MsgWrite) -> None:
+        """Queue a worker's domain write for the next group commit.
+
+        Args:
+            m (MsgWrite): The message object containing the write to apply.
+        """
+        self._pending_writes.append(m)
+        if len(self._pending_writes) >= MAX_BATCH_WRITES:
+            self._flush_writes()
+
+    def _flush_writes(self) -> None:
+        """Apply all pending domain writes inside one transaction (one commit/WAL sync).
+
+        Each write runs under its own SAVEPOINT: a failing write is rolled back on
+        its own and remembered so the task's final status is reported as "error",
+        while the rest of the batch still commits. Finishes deferred while their
+        write was pending are recorded afterwards.
+        """
+        assert self._conn is not None
+        batch, self._pending_writes = self._pending_writes, []
+        if batch:
+            # Settle buffered status updates first so a failed batch cannot roll them back.
+            self._commit_status(force=True)
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+                for m in batch:
+                    self._conn.execute("SAVEPOINT msg_write")
+                    try:
+                        m.apply(self._conn)
+                        self._conn.execute("RELEASE msg_write")
+                    except Exception as e:
+                        self._conn.execute("ROLLBACK TO msg_write")
+                        self._conn.execute("RELEASE msg_write")
+                        LOG.error("Write for task %s failed: %s", m.task_id, e)
+                        self._failed_writes[m.task_id] = str(e)
+                self._conn.commit()
+            except Exception as e:
+                self._conn.rollback()
+                LOG.error("Batch of %d writes failed: %s", len(batch), e)
+                for m in batch:
+                    self._failed_writes.setdefault(m.task_id, str(e))
+            finally:
+                for m in batch:
+                    if m.on_done is not None:
+                        try:
+                            m.on_done(self._conn)
+                        except Exception:
+                            LOG.debug("on_done for task %s failed", m.task_id, exc_info=True)
+            LOG.debug("Committed %d writes in one transaction", len(batch))
+
+        deferred, self._deferred_finishes = self._deferred_finishes, []
+        for f in deferred:
+            self._on_finished(f)
+
     def _on_finished(self, m: MsgTaskFinished) -> None:
         """Write final status and remove the per-task bar cleanly.
 
@@ -115,15 +209,23 @@ class SQLiteWriter(threading.Thread):
             m (MsgTaskFinished): The message object containing task information.
         """
         assert self._conn is not None
+        if any(w.task_id == m.task_id for w in self._pending_writes):
+            # Report the outcome only once this task's data is committed.
+            self._deferred_finishes.append(m)
+            return
+        failure = self._failed_writes.pop(m.task_id, None)
+        if failure is not None and m.status == "done":
+            m = replace(m, status="error", result=None, message=f"write failed: {failure}")
         if self._store:
+            self._begin_status()
             final = 1.0 if m.status == "done" else 0.0
             self._conn.execute(
                 """
                 UPDATE task_runs SET status=?, finished_at=?, progress=?, result=?, message=? WHERE id=?
                 """,
-                (m.status, m.finished_at, final, m.result, m.message, m.task_id),
+                (m.status, to_iso(m.finished_at), final, m.result, m.message, m.task_id),
             )
-            self._conn.commit()
+            self._commit_status()
 
         if self._progress:
             tid = self._progress_tasks.pop(m.task_id, None)
@@ -139,7 +241,7 @@ class SQLiteWriter(threading.Thread):
         - open connection
         - initialize schema (optional)
         - consume messages until SENTINEL arrives
-        - checkpoint and close
+        - flush pending writes, checkpoint and close
         """
         try:
             self._conn = dbmod.connect(self.db_path, wal=self._use_wal)
@@ -149,9 +251,11 @@ class SQLiteWriter(threading.Thread):
             while not self._stop_flag.is_set():
                 try:
                     item = self.msg_q.get(
-                        timeout=0.5,
+                        timeout=self.poll_interval,
                     )  # small timeout to enable graceful exit
                 except queue.Empty:
+                    if self._conn.in_transaction:
+                        self._commit_status(force=True)
                     continue
 
                 if item is SENTINEL:
@@ -164,15 +268,24 @@ class SQLiteWriter(threading.Thread):
                     self._on_progress(item)
                 elif isinstance(item, MsgTaskFinished):
                     self._on_finished(item)
+                elif isinstance(item, MsgWrite):
+                    self._on_write(item)
                 else:
                     LOG.warning("Unknown message: %r", type(item))
 
+                # Group commit: once the burst of queued messages is drained,
+                # persist every write that arrived in it with a single commit.
+                if self._pending_writes and self.msg_q.empty():
+                    self._flush_writes()
+
                 self.msg_q.task_done()
 
         finally:
             # Best-effort cleanup & checkpoint
             try:
                 if self._conn:
+                    self._flush_writes()
+                    self._commit_status(force=True)
                     self._conn.execute("ANALYZE;")
             except Exception:
                 LOG.debug("ANALYZE failed", exc_info=True)
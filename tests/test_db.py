@@ -91,3 +91,33 @@ def test_wal_checkpoint_commits(tmp_path: Path) -> None:
         assert _pragma_as_str(conn, "journal_mode").upper() == "WAL"
     finally:
         conn.close()
+
+
+@pytest.mark.db
+def test_connect_sets_cache_and_mmap(tmp_path: Path) -> None:
+    conn = connect(tmp_path / "tuned.db", wal=True)
+    try:
+        assert _pragma_as_str(conn, "cache_size") == "-200000"
+        assert _pragma_as_str(conn, "mmap_size") == "268435456"
+        # temp_store MEMORY => 2
+        assert _pragma_as_str(conn, "temp_store") == "2"
+    finally:
+        conn.close()
+
+
+@pytest.mark.db
+def test_connect_is_autocommit(tmp_path: Path) -> None:
+    conn = connect(tmp_path / "auto.db", wal=True)
+    try:
+        assert conn.isolation_level is None
+        conn.execute("CREATE TABLE t(x INTEGER);")
+        conn.execute("INSERT INTO t(x) VALUES (1);")
+        # No implicit transaction left open by the DB-API layer
+        assert not conn.in_transaction
+        conn.execute("BEGIN IMMEDIATE;")
+        conn.execute("INSERT INTO t(x) VALUES (2);")
+        assert conn.in_transaction
+        conn.commit()
+        assert conn.execute("SELECT COUNT(*) FROM t;").fetchone()[0] == 2
+    finally:
+        conn.close()
@@ -0,0 +1,117 @@
+import sqlite3
+
+import pytest
+
+from pipeloom.engine import run_pipeline
+from pipeloom.examples.csv_loader import CsvTask
+from pipeloom.examples.csv_loader import make_worker as make_csv_worker
+
+
+@pytest.mark.examples
+def test_csv_loader_fits_ragged_rows_to_header(tmp_path):
+    src = tmp_path / "items.csv"
+    src.write_text("id,name,qty,price\n1,a,3,1.5\n2,b\n\n3,c,1,2.0,extra\n")
+    db = tmp_path / "csv.db"
+
+    run_pipeline(
+        db_path=db,
+        tasks=[CsvTask(1, "items", src, "items")],
+        workers=1,
+        store_task_status=True,
+        worker_fn=make_csv_worker(),
+    )
+
+    con = sqlite3.connect(db)
+    try:
+        rows = con.execute("SELECT id, name, qty, price FROM items ORDER BY id").fetchall()
+        assert rows == [("1", "a", 3, 1.5), ("2", "b", None, None), ("3", "c", 1, 2.0)]
+        assert con.execute("SELECT status, result FROM task_runs").fetchone() == ("done", "rows:3")
+    finally:
+        con.close()
+
+
+def _etl_task(full_schema: bool):
+    pl = pytest.importorskip("polars")
+    etl = pytest.importorskip("pipeloom.examples.etl_http_json_sqlite")
+    ddl = "CREATE TABLE IF NOT EXISTS todos(id INTEGER PRIMARY KEY, title TEXT, completed INTEGER);"
+    schema = {"id": pl.Int64, "title": pl.String, "completed": pl.Boolean} if full_schema else {"id": pl.Int64}
+    return etl, etl.Task(1, "todos", "u", "todos", ddl, ("id", "title", "completed"), schema=schema)
+
+
+@pytest.mark.examples
+@pytest.mark.parametrize("full_schema", [True, False])
+def test_etl_extract_transform_is_lenient(full_schema):
+    etl, task = _etl_task(full_schema)
+
+    # A numeric string id, a missing key, a single-object body.
+    df = etl.extract_transform(task, b'[{"id": "3", "title": "a"}, {"id": 4, "completed": true}]').collect()
+    assert df.columns == ["id", "title", "completed"]
+    assert df["id"].to_list() == [3, 4]
+    assert df["title"].to_list() == ["a", None]
+    assert df["completed"].to_list() == [0, 1]
+
+    df = etl.extract_transform(task, b'{"id": 5, "title": "x"}').collect()
+    assert df.rows() == [(5, "x", 0)]
+
+
+@pytest.mark.examples
+@pytest.mark.parametrize("body", [b"", b"[]", b" [ ]\n"])
+def test_etl_extract_transform_empty_body(body):
+    etl, task = _etl_task(False)
+    df = etl.extract_transform(task, body).collect()
+    assert df.is_empty()
+    assert df.columns == ["id", "title", "completed"]
+
+
+class _Resp:
+    def __init__(self, status_code, content=b"", headers=None):
+        self.status_code, self.content, self.headers = status_code, content, headers or {}
+
+
+@pytest.mark.examples
+def test_etl_conditional_get_is_per_target_table(tmp_path, monkeypatch):
+    etl, todos = _etl_task(True)
+    copy = etl.Task(2, "copy", "u", "todos_copy", todos.schema_sql.replace("todos", "todos_copy"), todos.select_cols)
+    sent = []
+
+    def fake_get(url, *, etag=None, last_modified=None, timeout=15.0):
+        sent.append(etag)
+        if etag == '"v1"':
+            return _Resp(304)
+        return _Resp(200, b'[{"id": 1, "title": "a", "completed": true}]', {"ETag": '"v1"'})
+
+    monkeypatch.setattr(etl, "http_get", fake_get)
+    db = tmp_path / "etl.db"
+
+    def run(tasks):
+        run_pipeline(
+            db_path=db,
+            tasks=etl.with_cached_validators(db, tasks),
+            workers=1,
+            store_task_status=True,
+            worker_fn=etl.make_worker(),
+        )
+
+    run([todos])
+    run([todos, copy])  # same URL, new table: must not reuse the todos ETag
+    assert sent == [None, '"v1"', None]
+
+    con = sqlite3.connect(db)
+    try:
+        assert con.execute("SELECT id, title, completed FROM todos_copy").fetchall() == [(1, "a", 1)]
+        results = dict(con.execute("SELECT id, result FROM task_runs").fetchall())
+        assert results == {1: "not-modified:todos", 2: "ok:copy"}
+        con.execute("DROP TABLE todos_copy;")
+        con.commit()
+    finally:
+        con.close()
+
+    sent.clear()
+    run([copy])  # a dropped target table gets a full GET and is recreated
+    assert sent == [None]
+    con = sqlite3.connect(db)
+    try:
+        assert con.execute("SELECT id, title, completed FROM todos_copy").fetchall() == [(1, "a", 1)]
+        assert con.execute("SELECT status, result FROM task_runs WHERE id=2").fetchone() == ("done", "ok:copy")
+    finally:
+        con.close()
@@ -3,7 +3,7 @@ from dataclasses import FrozenInstanceError
 import pytest
 
 from pipeloom.demo import DemoTask
-from pipeloom.messages import MsgTaskFinished, MsgTaskProgress, MsgTaskStarted
+from pipeloom.messages import MsgTaskFinished, MsgTaskProgress, MsgTaskStarted, to_iso
 
 
 def test_demotask_defaults() -> None:
@@ -26,3 +26,10 @@ def test_messages_are_frozen() -> None:
     with pytest.raises(FrozenInstanceError):
         # type: ignore[attr-defined]
         f.status = "error"
+
+
+def test_to_iso_formats_epoch_nanoseconds() -> None:
+    assert to_iso(1_700_000_000_123_456_789) == "2023-11-14T22:13:20.123456+00:00"
+    assert to_iso(0) == "1970-01-01T00:00:00+00:00"
+    # ISO strings pass through untouched
+    assert to_iso("2024-01-01T00:00:00Z") == "2024-01-01T00:00:00Z"
@@ -2,7 +2,7 @@ import sqlite3
 
 import pytest
 
-from pipeloom.messages import SENTINEL, MsgTaskFinished, MsgTaskProgress, MsgTaskStarted
+from pipeloom.messages import SENTINEL, MsgTaskFinished, MsgTaskProgress, MsgTaskStarted, MsgWrite
 from pipeloom.writer import SQLiteWriter
 
 
@@ -25,6 +25,9 @@ def test_writer_persists_and_clears(tmp_path, monkeypatch):
     q.put(MsgTaskProgress(task_id=1, step=1, total=2, message="half"))
     q.put(MsgTaskProgress(task_id=1, step=2, total=2, message="done"))
     q.put(MsgTaskFinished(task_id=1, status="done", finished_at="2024-01-01T00:00:01Z"))
+    # Epoch-nanosecond timestamps are formatted by the writer
+    q.put(MsgTaskStarted(task_id=2, name="t2", started_at=1_700_000_000_000_000_000))
+    q.put(MsgTaskFinished(task_id=2, status="done", finished_at=1_700_000_001_500_000_000))
 
     q.put(SENTINEL)
     w.join(timeout=10)
@@ -33,5 +36,128 @@ def test_writer_persists_and_clears(tmp_path, monkeypatch):
     try:
         row = con.execute("SELECT status, progress FROM task_runs WHERE id=1").fetchone()
         assert row == ("done", 1.0)
+        row = con.execute("SELECT started_at, finished_at FROM task_runs WHERE id=2").fetchone()
+        assert row == ("2023-11-14T22:13:20+00:00", "2023-11-14T22:13:21.500000+00:00")
+    finally:
+        con.close()
+
+
+def _create_and_insert(conn: sqlite3.Connection) -> None:
+    conn.execute("CREATE TABLE IF NOT EXISTS items(id INTEGER PRIMARY KEY, name TEXT)")
+    conn.executemany("INSERT INTO items(id, name) VALUES (?, ?)", [(1, "a"), (2, "b")])
+
+
+def _fail(conn: sqlite3.Connection) -> None:
+    conn.execute("INSERT INTO items(id, name) VALUES (3, 'c')")
+    raise RuntimeError("boom")
+
+
+@pytest.mark.writer
+def test_writer_applies_domain_writes(tmp_path):
+    db = tmp_path / "writer.db"
+    q = __import__("queue").Queue(maxsize=64)
+
+    w = SQLiteWriter(db_path=db, msg_q=q, wal=True, store_task_status=True)
+    w.start()
+
+    q.put(MsgTaskStarted(task_id=1, name="ok", started_at="2024-01-01T00:00:00Z"))
+    q.put(MsgWrite(task_id=1, apply=_create_and_insert))
+    q.put(MsgTaskFinished(task_id=1, status="done", finished_at="2024-01-01T00:00:01Z"))
+    q.put(MsgTaskStarted(task_id=2, name="bad", started_at="2024-01-01T00:00:00Z"))
+    q.put(MsgWrite(task_id=2, apply=_fail))
+    q.put(MsgTaskFinished(task_id=2, status="done", finished_at="2024-01-01T00:00:01Z"))
+
+    q.put(SENTINEL)
+    w.join(timeout=10)
+
+    con = sqlite3.connect(db)
+    try:
+        assert con.execute("SELECT id, name FROM items ORDER BY id").fetchall() == [(1, "a"), (2, "b")]
+        rows = dict(con.execute("SELECT id, status FROM task_runs").fetchall())
+        assert rows == {1: "done", 2: "error"}
+        (message,) = con.execute("SELECT message FROM task_runs WHERE id=2").fetchone()
+        assert "boom" in message
+    finally:
+        con.close()
+
+
+@pytest.mark.writer
+def test_writer_group_commits_queued_writes(tmp_path):
+    db = tmp_path / "writer.db"
+    q = __import__("queue").Queue(maxsize=64)
+    seen: dict[str, object] = {}
+
+    def first(conn: sqlite3.Connection) -> None:
+        conn.execute("CREATE TABLE IF NOT EXISTS items(id INTEGER PRIMARY KEY)")
+        conn.execute("INSERT INTO items(id) VALUES (1)")
+
+    def second(conn: sqlite3.Connection) -> None:
+        conn.execute("INSERT INTO items(id) VALUES (2)")
+        # An independent reader must not see the first write yet: same transaction.
+        other = sqlite3.connect(db)
+        try:
+            seen["tables"] = other.execute("SELECT name FROM sqlite_master WHERE name='items'").fetchall()
+        finally:
+            other.close()
+
+    # Queue everything before the writer starts so both writes land in one batch.
+    q.put(MsgWrite(task_id=1, apply=first, on_done=lambda _: seen.setdefault("done", []).append(1)))
+    q.put(MsgWrite(task_id=2, apply=second, on_done=lambda _: seen.setdefault("done", []).append(2)))
+    q.put(SENTINEL)
+
+    w = SQLiteWriter(db_path=db, msg_q=q, wal=True, store_task_status=False)
+    w.start()
+    w.join(timeout=10)
+
+    assert seen["tables"] == []
+    assert seen["done"] == [1, 2]
+    con = sqlite3.connect(db)
+    try:
+        assert con.execute("SELECT COUNT(*) FROM items").fetchone() == (2,)
+    finally:
+        con.close()
+
+
+def _visible_runs(db) -> list[tuple]:
+    """Read task_runs from an independent connection: only committed rows show up."""
+    con = sqlite3.connect(db)
+    try:
+        return con.execute("SELECT id, status FROM task_runs ORDER BY id").fetchall()
+    finally:
+        con.close()
+
+
+@pytest.mark.writer
+@pytest.mark.parametrize("interval", [None, 60.0])
+def test_writer_batches_status_updates(tmp_path, interval):
+    db = tmp_path / "writer.db"
+    q = __import__("queue").Queue(maxsize=64)
+
+    w = SQLiteWriter(db_path=db, msg_q=q, wal=True, store_task_status=True, status_flush_interval=interval)
+    # Keep the idle commit out of the picture so the check below is deterministic.
+    w.poll_interval = 60.0
+    w.start()
+
+    for i in range(1, 4):
+        q.put(MsgTaskStarted(task_id=i, name=f"t{i}", started_at="2024-01-01T00:00:00Z"))
+        q.put(MsgTaskProgress(task_id=i, step=1, total=1, message="all"))
+        q.put(MsgTaskFinished(task_id=i, status="done", finished_at="2024-01-01T00:00:01Z"))
+    # Every message is handled; the writer is now blocked waiting for the next one.
+    q.join()
+
+    if interval is None:
+        # Unbatched: each update is committed as it is applied.
+        assert _visible_runs(db) == [(1, "done"), (2, "done"), (3, "done")]
+    else:
+        # Batched: the updates sit in one open transaction until shutdown.
+        assert _visible_runs(db) == []
+
+    q.put(SENTINEL)
+    w.join(timeout=10)
+
+    con = sqlite3.connect(db)
+    try:
+        rows = con.execute("SELECT id, status, progress FROM task_runs ORDER BY id").fetchall()
+        assert rows == [(1, "done", 1.0), (2, "done", 1.0), (3, "done", 1.0)]
     finally:
         con.close()